@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import random
+import subprocess
+import sys
+import time
+from webserver import Server
+from botserver import BotServer
+from router import Router
+from gamemanager import GameManager
+from gamemanagerapi import GameManagerApi
+from game import Game
+from leaderboard import Leaderboard
+from gameregistry import GameRegistry
+
+class BenchGame(Game):
+    def get_player_expected_output(self, round: int, player_index: int) -> bool:
+        return True
+
+    def get_game_data(self, round: int, player_index: int, expected_output: bool) -> str:
+        return "round %d" % round
+
+    def update_round(self, round: int, player_output: list["str | None"]):
+        pass
+
+def create_game_manager() -> GameManager:
+    game_manager = GameManager()
+    game_manager.add_lobby("Bench", BenchGame, 1, 1)
+    return game_manager
+
+def start_games(game_manager: GameManager, count: int) -> None:
+    for _ in range(count):
+        game_manager.game_start("Bench")
+    game_manager.update_games()
+
+async def http_get(port: int, path: str) -> str:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(("GET %s HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n" % path).encode())
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return data.decode()
+
+async def benchmark_http(players: int, rounds: int) -> float:
+    game_manager = create_game_manager()
+    router = Router("/")
+    api_router = router.add_sub_router("api/")
+    GameManagerApi(game_manager).setup_routes(api_router)
+
+    server = Server()
+    server.connection_handler = router.handle_request
+    listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+
+    names = ["http%d" % index for index in range(players)]
+    for name in names:
+        await http_get(port, "/api/player/join/%s" % name)
+        await http_get(port, "/api/lobby/join/Bench/%s" % name)
+    start_games(game_manager, players)
+
+    elapsed = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await asyncio.gather(*(http_get(port, "/api/play/output/%s/move" % name) for name in names))
+        elapsed += time.perf_counter() - start
+        game_manager.update_games()
+
+    listener.close()
+    await listener.wait_closed()
+    return players * rounds / elapsed
+
+async def bot_command(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, command: str) -> str:
+    writer.write(("%s\n" % command).encode())
+    await writer.drain()
+    return (await reader.readline()).decode()
+
+async def benchmark_bot(players: int, rounds: int) -> float:
+    game_manager = create_game_manager()
+    bot_server = BotServer(game_manager)
+    listener = await asyncio.start_server(bot_server.handle_connection, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+
+    connections = []
+    for index in range(players):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await bot_command(reader, writer, "JOIN bot%d" % index)
+        await bot_command(reader, writer, "LOBBY Bench")
+        connections.append((reader, writer))
+    start_games(game_manager, players)
+
+    elapsed = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await asyncio.gather(*(bot_command(reader, writer, "OUTPUT move") for reader, writer in connections))
+        elapsed += time.perf_counter() - start
+        game_manager.update_games()
+
+    for reader, writer in connections:
+        writer.write(b"QUIT\n")
+        writer.close()
+    listener.close()
+    await listener.wait_closed()
+    return players * rounds / elapsed
+
+async def run_protocol_benchmark():
+    players = 50
+    rounds = 20
+
+    print("protocol throughput, %d players x %d rounds" % (players, rounds))
+    http_rate = await benchmark_http(players, rounds)
+    print("  http  %10.0f moves/s" % http_rate)
+    bot_rate = await benchmark_bot(players, rounds)
+    print("  bot   %10.0f moves/s (%.1fx)" % (bot_rate, bot_rate / http_rate))
+
+def run_leaderboard_benchmark():
+    players = 1000000
+    operations = 100000
+    names = ["player%d" % index for index in range(players)]
+    leaderboard = Leaderboard()
+
+    print("leaderboard, %d scored players" % players)
+    start = time.perf_counter()
+    for name in names:
+        leaderboard.set_score(name, random.randint(0, 1000000))
+    elapsed = time.perf_counter() - start
+    print("  insert    %10.0f ops/s" % (players / elapsed))
+
+    samples = random.sample(names, operations)
+
+    start = time.perf_counter()
+    for name in samples:
+        leaderboard.add_score(name, random.randint(-100, 100))
+    elapsed = time.perf_counter() - start
+    print("  update    %10.0f ops/s" % (operations / elapsed))
+
+    start = time.perf_counter()
+    for name in samples:
+        leaderboard.get_rank(name)
+    elapsed = time.perf_counter() - start
+    print("  rank      %10.0f ops/s" % (operations / elapsed))
+
+    start = time.perf_counter()
+    for _ in range(operations):
+        leaderboard.get_top(10, random.randrange(players))
+    elapsed = time.perf_counter() - start
+    print("  top 10    %10.0f ops/s" % (operations / elapsed))
+
+def run_startup_benchmark():
+    runs = 5
+
+    print("startup, average of %d runs" % runs)
+    start = time.perf_counter()
+    for _ in range(runs):
+        subprocess.run([sys.executable, "-c", "import main"], check=True)
+    elapsed = time.perf_counter() - start
+    print("  import main        %8.1f ms" % (elapsed / runs * 1000))
+
+    start = time.perf_counter()
+    game_registry = GameRegistry()
+    game_registry.load_config("games.json")
+    game_manager = GameManager()
+    game_registry.add_lobbies(game_manager)
+    elapsed = time.perf_counter() - start
+    print("  register games     %8.1f ms" % (elapsed * 1000))
+
+    start = time.perf_counter()
+    for entry in game_registry.entries.values():
+        entry.factory.load()
+    elapsed = time.perf_counter() - start
+    print("  first game import  %8.1f ms" % (elapsed * 1000))
+
+async def main(benchmarks: list[str]):
+    if "protocol" in benchmarks:
+        await run_protocol_benchmark()
+    if "leaderboard" in benchmarks:
+        run_leaderboard_benchmark()
+    if "startup" in benchmarks:
+        run_startup_benchmark()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(main(sys.argv[1:] or ["protocol", "leaderboard", "startup"]))
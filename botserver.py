@@ -0,0 +1,174 @@
+import asyncio
+from dataclasses import dataclass
+import logging
+from gamemanager import GameManager, GameManagerError, GameState
+
+# Newline delimited protocol for bot clients over one persistent connection.
+#
+# Client commands:
+#   JOIN <player>      join the game manager as player, binds the connection to that player
+#   LOBBY <lobby>      join a lobby as the bound player
+#   OUTPUT <output>    provide output for the current round
+#   SUBSCRIBE          push round data for the bound player as rounds are set up
+#   QUIT               close the connection
+#
+# Server replies, tagged with the number of the command they answer, counting from 1 per connection:
+#   OK <command number>
+#   ERROR <command number> <message>
+#
+# Server pushes after SUBSCRIBE, at any time between replies:
+#   ROUND <game id> <round> <expected output 0|1> <game data>
+#
+# A subscribed bot that falls more than push_queue_size rounds behind is disconnected.
+
+@dataclass
+class BotConnection:
+    name: str
+    writer: asyncio.StreamWriter
+    player_name: str = None
+    command_count: int = 0
+    pushes: "asyncio.Queue | None" = None
+    push_task: "asyncio.Task | None" = None
+
+class BotServer:
+    def __init__(self, game_manager: GameManager, host: str = "192.168.99.108", port: int = 12346, push_queue_size: int = 16) -> None:
+        self.server: asyncio.base_events.Server = None
+        self.game_manager = game_manager
+        self.host = host
+        self.port = port
+        self.push_queue_size = push_queue_size
+        self.subscriptions: dict[str, BotConnection] = {}
+
+        self.game_manager.add_round_listener(self.push_round)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        addr = writer.get_extra_info("peername")
+        connection = BotConnection("%s:%d" % (addr[0], addr[1]), writer)
+        logging.info("BOTSERVER connection from %s" % connection.name)
+
+        try:
+            while True:
+                data = await reader.readline()
+                if not data:
+                    break
+
+                line = data.decode().rstrip("\r\n")
+                logging.debug("BOTSERVER read from %s: %s" % (connection.name, line))
+                if line == "QUIT":
+                    break
+
+                writer.write(self.handle_command(connection, line).encode())
+                await writer.drain()
+
+        except ConnectionResetError as ex:
+            logging.error("BOTSERVER ERROR reading from %s - connection reset error" % connection.name, exc_info=ex)
+        except Exception as ex:
+            logging.error("BOTSERVER ERROR while handling connection from %s" % connection.name, exc_info=ex)
+
+        self.close_connection(connection)
+        writer.close()
+
+    def handle_command(self, connection: BotConnection, line: str) -> str:
+        command, _, argument = line.partition(" ")
+        connection.command_count += 1
+
+        try:
+            if command == "JOIN":
+                if connection.player_name is not None:
+                    raise GameManagerError("Connection already joined as player: %s" % connection.player_name)
+
+                self.game_manager.player_join(argument)
+                connection.player_name = argument
+
+            elif connection.player_name is None:
+                raise GameManagerError("Connection must JOIN before %s" % command)
+
+            elif command == "LOBBY":
+                self.game_manager.lobby_join(argument, connection.player_name)
+
+            elif command == "OUTPUT":
+                self.game_manager.set_player_output(connection.player_name, argument)
+
+            elif command == "SUBSCRIBE":
+                if connection.pushes is None:
+                    connection.pushes = asyncio.Queue(self.push_queue_size)
+                    connection.push_task = asyncio.create_task(self.write_pushes(connection))
+                self.subscriptions[connection.player_name] = connection
+
+                #The current round was set up before subscribing, so it would never be pushed
+                player = self.game_manager.get_player(connection.player_name)
+                if player.game_id is not None:
+                    game_state = self.game_manager.get_game_state(player.game_id)
+                    if game_state.round > 0:
+                        self.queue_round(connection, game_state, game_state.game.players.index(player.name))
+
+            else:
+                raise GameManagerError("Unknown command: %s" % command)
+
+        except GameManagerError as ex:
+            return "ERROR %d %s\n" % (connection.command_count, ex)
+
+        return "OK %d\n" % connection.command_count
+
+    async def write_pushes(self, connection: BotConnection) -> None:
+        try:
+            while not connection.writer.is_closing():
+                data = await connection.pushes.get()
+                connection.writer.write(data)
+                await connection.writer.drain()
+
+        except ConnectionResetError as ex:
+            logging.error("BOTSERVER ERROR writing to %s - connection reset error" % connection.name, exc_info=ex)
+
+    def close_connection(self, connection: BotConnection) -> None:
+        if connection.push_task:
+            connection.push_task.cancel()
+
+        if connection.player_name is None:
+            return
+
+        if self.subscriptions.get(connection.player_name) is connection:
+            del self.subscriptions[connection.player_name]
+
+        try:
+            self.game_manager.player_disconnect(connection.player_name)
+        except GameManagerError as ex:
+            logging.warning("BOTSERVER ERROR could not disconnect player %s" % connection.player_name, exc_info=ex)
+
+    def push_round(self, game_state: GameState) -> None:
+        for player_index, player_name in enumerate(game_state.game.players):
+            connection = self.subscriptions.get(player_name)
+            if connection is None:
+                continue
+
+            self.queue_round(connection, game_state, player_index)
+
+    def queue_round(self, connection: BotConnection, game_state: GameState, player_index: int) -> None:
+        data = game_state.game_data[player_index]
+        data = "" if data is None else str(data).replace("\n", "\\n")
+        expected = 1 if game_state.player_expected_output[player_index] else 0
+        try:
+            connection.pushes.put_nowait(("ROUND %s %d %d %s\n" % (game_state.id, game_state.round, expected, data)).encode())
+        except asyncio.QueueFull:
+            logging.warning("BOTSERVER dropping slow bot %s (%s)" % (connection.name, connection.player_name))
+            del self.subscriptions[connection.player_name]
+            connection.writer.close()
+
+    async def start_server(self) -> None:
+        try:
+            self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        except asyncio.CancelledError as ex:
+            logging.warning("BOTSERVER ERROR start server cancelled", exc_info=ex)
+            return
+        except Exception as ex:
+            logging.error("BOTSERVER ERROR server could not be started", exc_info=ex)
+            return
+
+        addr = self.server.sockets[0].getsockname() if self.server.sockets else "unknown"
+        logging.info("BOTSERVER serving on %s" % (addr,))
+
+        async with self.server:
+            try:
+                await self.server.serve_forever()
+            except asyncio.CancelledError as ex:
+                logging.warning("BOTSERVER ERROR server cancelled", exc_info=ex)
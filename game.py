@@ -1,20 +1,29 @@
 
+from typing import Callable
+
 class GameOverError(Exception):
     pass
 
+ScoreListener = Callable[[int, int, int], None]
+
 class Game:
     def __init__(self, players: list[str]) -> None:
         self.players: list[str] = players
         self.scores = [0 for _ in players]
+        self.score_listeners: list[ScoreListener] = []
 
     def get_name(self) -> str:
         return ""
 
     def set_score(self, player_index: int, score: int) -> None:
+        old_score = self.scores[player_index]
         self.scores[player_index] = score
 
+        for listener in self.score_listeners:
+            listener(player_index, old_score, score)
+
     def add_score(self, player_index: int, score: int) -> None:
-        self.scores[player_index] += score
+        self.set_score(player_index, self.scores[player_index] + score)
 
     def setup_game(self) -> None:
         pass
@@ -1,9 +1,12 @@
 from dataclasses import dataclass, field
 from game import Game, GameOverError
+from tracing import Tracer, Trace, span
 import random
 import string
 import logging
 import asyncio
+from functools import partial
+from typing import Callable
 
 @dataclass
 class Player:
@@ -14,7 +17,7 @@ class Player:
 @dataclass
 class Lobby:
     name: str
-    game_factory: type[Game]
+    game_factory: Callable[[list[str]], Game]
     min_players: int
     max_players: int
     players: list[Player] = field(default_factory=list)
@@ -29,12 +32,20 @@ class GameState:
     player_expected_output: list[bool] = field(default_factory=list)
     game_data: list["str | None"] = field(default_factory=list)
     player_output: list["str | None"] = field(default_factory=list)
+    output_trace_ids: list[str] = field(default_factory=list)
 
 class GameManagerError(Exception):
     pass
 
+RoundListener = Callable[[GameState], None]
+GameScoreListener = Callable[[GameState, int, int, int], None]
+GameEndListener = Callable[[GameState], None]
+
 class GameManager:
-    def __init__(self) -> None:
+    def __init__(self, tracer: Tracer = None, game_id_prefix: str = "") -> None:
+        self.tracer: Tracer = tracer if tracer else Tracer(0)
+        self.game_id_prefix = game_id_prefix
+
         self.lobbies: list[Lobby] = []
         self.lobby_name_map: dict[str, Lobby] = {}
 
@@ -45,7 +56,27 @@ class GameManager:
         self.active_games: list[GameState] = []
         self.game_id_map: dict[str, GameState] = {}
 
-    def add_lobby(self, name: str, game_factory: type[Game], min_players: int, max_players: int = 0) -> None:
+        self.round_listeners: list[RoundListener] = []
+        self.score_listeners: list[GameScoreListener] = []
+        self.game_end_listeners: list[GameEndListener] = []
+
+    def add_round_listener(self, listener: RoundListener) -> None:
+        self.round_listeners.append(listener)
+
+    def add_score_listener(self, listener: GameScoreListener) -> None:
+        self.score_listeners.append(listener)
+
+    def add_game_end_listener(self, listener: GameEndListener) -> None:
+        self.game_end_listeners.append(listener)
+
+    def notify_score_listeners(self, game_state: GameState, player_index: int, old_score: int, new_score: int) -> None:
+        for listener in self.score_listeners:
+            try:
+                listener(game_state, player_index, old_score, new_score)
+            except Exception as ex:
+                logging.error("GAMEMANAGER ERROR score listener failed for game %s (%s)" % (game_state.id, game_state.name), exc_info=ex)
+
+    def add_lobby(self, name: str, game_factory: Callable[[list[str]], Game], min_players: int, max_players: int = 0) -> None:
         if name in self.lobby_name_map:
             raise GameManagerError("Lobby already exists: %s" % name)
 
@@ -81,6 +112,30 @@ class GameManager:
         self.players.remove(player)
         del self.player_name_map[name]
 
+    def detach_player(self, name: str) -> Player:
+        if name not in self.player_name_map:
+            raise GameManagerError("Player does not exist: %s" % name)
+
+        player = self.player_name_map[name]
+
+        if player.lobby_name is not None:
+            raise GameManagerError("Player %s cannot be moved, they are in lobby: %s" % (name, player.lobby_name))
+        if player.game_id is not None:
+            raise GameManagerError("Player %s cannot be moved, they are in game: %s" % (name, player.game_id))
+
+        logging.info("GAMEMANAGER detaching player %s" % name)
+        self.players.remove(player)
+        del self.player_name_map[name]
+        return player
+
+    def attach_player(self, player: Player) -> None:
+        if player.name in self.player_name_map:
+            raise GameManagerError("Player already exists: %s" % player.name)
+
+        logging.info("GAMEMANAGER attaching player %s" % player.name)
+        self.players.append(player)
+        self.player_name_map[player.name] = player
+
     def lobby_join(self, lobby_name: str, player_name: str) -> None:
         if lobby_name not in self.lobby_name_map:
             raise GameManagerError("Lobby does not exist: %s" % lobby_name)
@@ -122,10 +177,25 @@ class GameManager:
         player.lobby_name = None
         lobby.players.remove(player)
 
+    def is_game_active(self, game_id: str) -> bool:
+        return self.get_game_state(game_id) in self.active_games
+
+    def get_player(self, player_name: str) -> Player:
+        if player_name not in self.player_name_map:
+            raise GameManagerError("Player does not exist: %s" % player_name)
+
+        return self.player_name_map[player_name]
+
+    def get_game_state(self, game_id: str) -> GameState:
+        if game_id not in self.game_id_map:
+            raise GameManagerError("Game does not exist: %s" % game_id)
+
+        return self.game_id_map[game_id]
+
     def random_game_id(self, length: int) -> str:
         for attempt in range(10):
-            id = ""
-            while len(id) < length:
+            id = self.game_id_prefix
+            while len(id) < len(self.game_id_prefix) + length:
                 id += random.choice(string.ascii_lowercase)
             
             if id not in self.game_id_map:
@@ -133,7 +203,7 @@ class GameManager:
 
         raise GameManagerError("Could not generate unique game id after %d attempts" % (attempt + 1))
 
-    def game_start(self, lobby_name: str) -> None:
+    def game_start(self, lobby_name: str) -> str:
         if lobby_name not in self.lobby_name_map:
             raise GameManagerError("Lobby does not exist: %s" % lobby_name)
         
@@ -153,6 +223,7 @@ class GameManager:
         game = lobby.game_factory(names)
         game_name = game.get_name()
         game_state = GameState(game_id, game, game_name, lobby_name)
+        game.score_listeners.append(partial(self.notify_score_listeners, game_state))
 
         for player in players:
             self.lobby_leave(lobby.name, player.name)
@@ -165,6 +236,7 @@ class GameManager:
 
         logging.info("GAMEMANAGER set up game %s (%s)" % (game_id, game_name))
         game.setup_game()
+        return game_id
 
     def game_leave(self, game_id: str, player_name: str) -> None:
         if game_id not in self.game_id_map:
@@ -186,7 +258,7 @@ class GameManager:
         player.game_id = None
         #TODO: remove the game from the game manager?
 
-    def set_player_output(self, player_name: str, player_output: str) -> None:
+    def set_player_output(self, player_name: str, player_output: str, trace: "Trace | None" = None) -> None:
         if player_name not in self.player_name_map:
             raise GameManagerError("Player does not exist: %s" % player_name)
         if not player_output:
@@ -212,6 +284,11 @@ class GameManager:
         logging.info("GAMEMANAGER player %s provided output for game %s (%s)" % (player_name, player_game_state.id, player_game_state.name))
         player_game_state.player_output[player_index] = player_output
 
+        if trace:
+            trace.attributes["game_id"] = player_game_state.id
+            trace.attributes["round"] = str(player_game_state.round)
+            player_game_state.output_trace_ids.append(trace.id)
+
     async def start_game_loop(self) -> None:
         try:
             while True:
@@ -230,13 +307,22 @@ class GameManager:
                 self.update_game(game_state)
             except GameOverError as ex:
                 logging.warning("GAMEMANAGER ERROR game over encountered in game %s (%s)" % (game_state.id, game_state.name), exc_info=ex)
-                self.active_games.remove(game_state)
+                self.end_game(game_state)
             except GameManagerError as ex:
                 logging.error("GAMEMANAGER ERROR while updating game %s (%s)" % (game_state.id, game_state.name), exc_info=ex)
-                self.active_games.remove(game_state)
+                self.end_game(game_state)
             except Exception as ex:
                 logging.critical("GAMEMANAGER ERROR while updating game %s (%s)" % (game_state.id, game_state.name), exc_info=ex)
-                self.active_games.remove(game_state)
+                self.end_game(game_state)
+
+    def end_game(self, game_state: GameState) -> None:
+        self.active_games.remove(game_state)
+
+        for listener in self.game_end_listeners:
+            try:
+                listener(game_state)
+            except Exception as ex:
+                logging.error("GAMEMANAGER ERROR game end listener failed for game %s (%s)" % (game_state.id, game_state.name), exc_info=ex)
 
     def update_game(self, game_state: GameState) -> None:
         logging.info("GAMEMANAGER updating game %s (%s)" % (game_state.id, game_state.name))
@@ -247,9 +333,22 @@ class GameManager:
 
         if self.is_round_over(game_state):
             logging.info("GAMEMANAGER update round %d for game %s (%s)" % (game_state.round, game_state.id, game_state.name))
-            game_state.game.update_round(game_state.round, game_state.player_output)
 
-            self.set_up_round(game_state)
+            #Always keep the round update when a sampled output request triggered it
+            trace = self.tracer.start_trace("game.update", force=bool(game_state.output_trace_ids))
+            if trace:
+                trace.links = game_state.output_trace_ids
+                trace.attributes["game_id"] = game_state.id
+                trace.attributes["round"] = str(game_state.round)
+
+            try:
+                with span(trace, "game.update_round"):
+                    game_state.game.update_round(game_state.round, game_state.player_output)
+
+                with span(trace, "game.set_up_round"):
+                    self.set_up_round(game_state)
+            finally:
+                self.tracer.finish_trace(trace)
 
     def set_up_round(self, game_state: GameState) -> None:
         game = game_state.game
@@ -263,6 +362,7 @@ class GameManager:
         game_state.player_expected_output = []
         game_state.game_data = []
         game_state.player_output = []
+        game_state.output_trace_ids = []
         for player_index, player_name in enumerate(players):
             expected = game.get_player_expected_output(game_state.round, player_index)
             data = game.get_game_data(game_state.round, player_index, expected)
@@ -271,6 +371,12 @@ class GameManager:
             game_state.game_data.append(data)
             game_state.player_output.append(None)
 
+        for listener in self.round_listeners:
+            try:
+                listener(game_state)
+            except Exception as ex:
+                logging.error("GAMEMANAGER ERROR round listener failed for game %s (%s)" % (game_state.id, game_state.name), exc_info=ex)
+
     def is_round_over(self, game_state: GameState) -> None:
         if not game_state.player_expected_output:
             raise RuntimeError("Cannot determine if the round is over, there is no player expected output")
@@ -2,7 +2,7 @@
 from router import Router, RouterContext
 from gamemanager import GameManager, GameManagerError
 from webserver import Request, Response
-from util import parse_url_path
+from util import parse_url_path, build_response
 
 class GameManagerApi:
     def __init__(self, game_manager: GameManager) -> None:
@@ -12,19 +12,19 @@ class GameManagerApi:
         try:
             path = parse_url_path(router_context.additional)
             self.game_manager.player_join(path[0])
-            return self.build_response(True)
+            return build_response(True)
 
         except GameManagerError as ex:
-            return self.build_response(False, str(ex))
+            return build_response(False, str(ex))
 
     def player_disconnect(self, request: Request, router_context: RouterContext) -> Response:
         try:
             path = parse_url_path(router_context.additional)
             self.game_manager.player_disconnect(path[0])
-            return self.build_response(True)
+            return build_response(True)
 
         except GameManagerError as ex:
-            return self.build_response(False, str(ex))
+            return build_response(False, str(ex))
 
     def player_list(self, request: Request, router_context: RouterContext) -> Response:
         players = [{
@@ -33,7 +33,7 @@ class GameManagerApi:
             "game": player.game_id
         } for player in self.game_manager.players]
 
-        return self.build_response(True, extra={
+        return build_response(True, extra={
             "players": players
         })
 
@@ -41,19 +41,19 @@ class GameManagerApi:
         try:
             path = parse_url_path(router_context.additional)
             self.game_manager.lobby_join(path[0], path[1])
-            return self.build_response(True)
+            return build_response(True)
 
         except GameManagerError as ex:
-            return self.build_response(False, str(ex))
+            return build_response(False, str(ex))
 
     def lobby_leave(self, request: Request, router_context: RouterContext) -> Response:
         try:
             path = parse_url_path(router_context.additional)
             self.game_manager.lobby_leave(path[0], path[1])
-            return self.build_response(True)
+            return build_response(True)
 
         except GameManagerError as ex:
-            return self.build_response(False, str(ex))
+            return build_response(False, str(ex))
 
     def lobby_list(self, request: Request, router_context: RouterContext) -> Response:
         lobbies = [{
@@ -64,7 +64,7 @@ class GameManagerApi:
             "player_count": len(lobby.players)
         } for lobby in self.game_manager.lobbies]
 
-        return self.build_response(True, extra={
+        return build_response(True, extra={
             "lobbies": lobbies
         })
 
@@ -72,28 +72,28 @@ class GameManagerApi:
         try:
             path = parse_url_path(router_context.additional)
             self.game_manager.game_start(path[0])
-            return self.build_response(True)
+            return build_response(True)
 
         except GameManagerError as ex:
-            return self.build_response(False, str(ex))
+            return build_response(False, str(ex))
 
     def game_leave(self, request: Request, router_context: RouterContext) -> Response:
         try:
             path = parse_url_path(router_context.additional)
             self.game_manager.game_leave(path[0], path[1])
-            return self.build_response(True)
+            return build_response(True)
 
         except GameManagerError as ex:
-            return self.build_response(False, str(ex))
+            return build_response(False, str(ex))
 
     def set_player_output(self, request: Request, router_context: RouterContext) -> Response:
         try:
             path = parse_url_path(router_context.additional)
-            self.game_manager.set_player_output(path[0], path[1])
-            return self.build_response(True)
+            self.game_manager.set_player_output(path[0], path[1], request.trace)
+            return build_response(True)
 
         except GameManagerError as ex:
-            return self.build_response(False, str(ex))
+            return build_response(False, str(ex))
 
     def game_list(self, request: Request, router_context: RouterContext) -> Response:
         games = [{
@@ -104,29 +104,10 @@ class GameManagerApi:
             "player_count": len(game_state.game.players)
         } for game_state in self.game_manager.games]
 
-        return self.build_response(True, extra={
+        return build_response(True, extra={
             "games": games
         })
 
-    def build_response(self, success: bool, message: str = "", extra: dict = {}) -> Response:
-        response = {}
-        status = ""
-
-        if success:
-            response["status"] = "success"
-            status = "200"
-        else:
-            response["status"] = "error"
-            status = "400"
-
-        if message:
-            response["message"] = message
-
-        if extra:
-            response.update(extra)
-
-        return Response(response, status)
-        
     def setup_routes(self, router: Router) -> None:
         player_router = router.add_sub_router("player/")
         player_router.add_prefix_route("join", self.player_join)
@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from game import Game
+from gamemanager import GameManager, GameManagerError
+from importlib import import_module, reload
+from importlib.metadata import entry_points
+from types import ModuleType
+import json
+import logging
+import os
+import sys
+
+class GameRegistryError(GameManagerError):
+    pass
+
+class GameFactory:
+    """
+    Creates games from a "module:Class" path. The module is only imported when the first game
+    is created, and is reloaded before creating a game if its source file has changed.
+    """
+
+    def __init__(self, path: str) -> None:
+        if ":" not in path:
+            raise GameRegistryError("Game path must look like module:Class: %s" % path)
+
+        self.path = path
+        self.module_name, self.class_name = path.split(":", 1)
+        self.module: ModuleType = None
+        self.game_class: type[Game] = None
+        self.mtime: float = None
+        self.import_failed = False
+
+    def __call__(self, players: list[str]) -> Game:
+        return self.load()(players)
+
+    def is_loaded(self) -> bool:
+        return self.game_class is not None
+
+    def get_mtime(self, module: ModuleType) -> "float | None":
+        file_name = getattr(module, "__file__", None)
+        if not file_name:
+            return None
+
+        try:
+            return os.stat(file_name).st_mtime
+        except OSError:
+            return None
+
+    def load(self) -> type[Game]:
+        if self.game_class is None:
+            self.import_game()
+
+        elif self.get_mtime(self.module) != self.mtime:
+            #Keep creating games with the previous code if the changed module is broken
+            try:
+                self.reload()
+            except GameRegistryError as ex:
+                logging.error("GAMEREGISTRY ERROR could not reload %s" % self.path, exc_info=ex)
+                self.mtime = self.get_mtime(self.module)
+
+        if self.game_class is None:
+            raise GameRegistryError("Game could not be loaded: %s" % self.path)
+
+        return self.game_class
+
+    def reload(self) -> None:
+        if self.game_class is None:
+            self.import_game()
+            return
+
+        logging.info("GAMEREGISTRY reloading %s" % self.module_name)
+        try:
+            module = reload(self.module)
+        except Exception as ex:
+            raise GameRegistryError("Could not reload game %s: %s" % (self.path, ex)) from ex
+
+        self.resolve(module)
+
+    def import_game(self) -> None:
+        logging.info("GAMEREGISTRY importing %s" % self.module_name)
+        try:
+            #A module left behind by a failed attempt may have been fixed since
+            if self.import_failed and self.module_name in sys.modules:
+                module = reload(sys.modules[self.module_name])
+            else:
+                module = import_module(self.module_name)
+        except Exception as ex:
+            self.import_failed = True
+            raise GameRegistryError("Could not import game %s: %s" % (self.path, ex)) from ex
+
+        try:
+            self.resolve(module)
+        except GameRegistryError:
+            self.import_failed = True
+            raise
+
+        self.import_failed = False
+
+    def resolve(self, module: ModuleType) -> None:
+        game_class = getattr(module, self.class_name, None)
+        if not isinstance(game_class, type) or not issubclass(game_class, Game):
+            raise GameRegistryError("%s is not a Game subclass" % self.path)
+
+        self.module = module
+        self.game_class = game_class
+        self.mtime = self.get_mtime(module)
+
+@dataclass
+class GameEntry:
+    name: str
+    factory: GameFactory
+    min_players: int = 1
+    max_players: int = 0
+
+class GameRegistry:
+    def __init__(self) -> None:
+        self.entries: dict[str, GameEntry] = {}
+
+    def add_game(self, name: str, path: str, min_players: int = 1, max_players: int = 0) -> None:
+        if name in self.entries:
+            raise GameRegistryError("Game already registered: %s" % name)
+
+        logging.info("GAMEREGISTRY registering %s (%s)" % (name, path))
+        self.entries[name] = GameEntry(name, GameFactory(path), min_players, max_players)
+
+    def load_config(self, file_name: str) -> None:
+        with open(file_name) as f:
+            config = json.load(f)
+
+        for game in config.get("games", []):
+            self.add_game(game["name"], game["game"], game.get("min_players", 1), game.get("max_players", 0))
+
+    def load_entry_points(self, group: str = "webgame.games") -> None:
+        for entry_point in entry_points(group=group):
+            self.add_game(entry_point.name, entry_point.value)
+
+    def reload(self, name: str) -> None:
+        if name not in self.entries:
+            raise GameRegistryError("Game is not registered: %s" % name)
+
+        self.entries[name].factory.reload()
+
+    def add_lobbies(self, game_manager: GameManager) -> None:
+        for entry in self.entries.values():
+            game_manager.add_lobby(entry.name, entry.factory, entry.min_players, entry.max_players)
@@ -0,0 +1,35 @@
+from router import Router, RouterContext
+from gameregistry import GameRegistry, GameRegistryError
+from webserver import Request, Response
+from util import parse_url_path, build_response
+
+class GameRegistryApi:
+    def __init__(self, game_registry: GameRegistry) -> None:
+        self.game_registry = game_registry
+
+    def registry_list(self, request: Request, router_context: RouterContext) -> Response:
+        games = [{
+            "name": entry.name,
+            "game": entry.factory.path,
+            "loaded": entry.factory.is_loaded(),
+            "min_players": entry.min_players,
+            "max_players": entry.max_players
+        } for entry in self.game_registry.entries.values()]
+
+        return build_response(True, extra={
+            "games": games
+        })
+
+    def registry_reload(self, request: Request, router_context: RouterContext) -> Response:
+        try:
+            path = parse_url_path(router_context.additional)
+            self.game_registry.reload(path[0])
+            return build_response(True)
+
+        except GameRegistryError as ex:
+            return build_response(False, str(ex))
+
+    def setup_routes(self, router: Router) -> None:
+        registry_router = router.add_sub_router("registry/")
+        registry_router.add_prefix_route("list", self.registry_list)
+        registry_router.add_prefix_route("reload", self.registry_reload)
@@ -0,0 +1,251 @@
+from gamemanager import GameManager, GameState
+import heapq
+import logging
+import random
+import time
+
+class LeaderboardError(Exception):
+    pass
+
+class SkipListNode:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: tuple, level: int) -> None:
+        self.key = key
+        self.next: list["SkipListNode"] = [None] * level
+        self.width: list[int] = [1] * level
+
+class SkipList:
+    """
+    Indexable skip list of sorted keys. Each link stores how many items it skips,
+    so finding the rank of a key or the key at an index is O(log n).
+    """
+
+    def __init__(self, max_level: int = 24) -> None:
+        self.max_level = max_level
+        self.size = 0
+        self.tail = SkipListNode(None, 0)
+        self.head = SkipListNode(None, max_level)
+        self.head.next = [self.tail] * max_level
+
+    def __len__(self) -> int:
+        return self.size
+
+    def random_level(self) -> int:
+        level = 1
+        while level < self.max_level and random.random() < 0.5:
+            level += 1
+        return level
+
+    def find_chain(self, key: tuple) -> tuple[list[SkipListNode], list[int]]:
+        chain = [None] * self.max_level
+        steps = [0] * self.max_level
+        node = self.head
+        for level in reversed(range(self.max_level)):
+            while node.next[level] is not self.tail and node.next[level].key < key:
+                steps[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        return chain, steps
+
+    def insert(self, key: tuple) -> None:
+        chain, steps = self.find_chain(key)
+        level = self.random_level()
+        new_node = SkipListNode(key, level)
+
+        skipped = 0
+        for index in range(level):
+            previous = chain[index]
+            new_node.next[index] = previous.next[index]
+            previous.next[index] = new_node
+            new_node.width[index] = previous.width[index] - skipped
+            previous.width[index] = skipped + 1
+            skipped += steps[index]
+
+        for index in range(level, self.max_level):
+            chain[index].width[index] += 1
+
+        self.size += 1
+
+    def remove(self, key: tuple) -> None:
+        chain, _ = self.find_chain(key)
+        node = chain[0].next[0]
+        if node is self.tail or node.key != key:
+            raise KeyError(key)
+
+        level = len(node.next)
+        for index in range(level):
+            chain[index].width[index] += node.width[index] - 1
+            chain[index].next[index] = node.next[index]
+
+        for index in range(level, self.max_level):
+            chain[index].width[index] -= 1
+
+        self.size -= 1
+
+    def rank(self, key: tuple) -> int:
+        rank = 0
+        node = self.head
+        for level in reversed(range(self.max_level)):
+            while node.next[level] is not self.tail and node.next[level].key < key:
+                rank += node.width[level]
+                node = node.next[level]
+
+        if node.next[0] is self.tail or node.next[0].key != key:
+            raise KeyError(key)
+
+        return rank
+
+    def slice(self, start: int, count: int) -> list[tuple]:
+        if start < 0 or start >= self.size:
+            return []
+
+        node = self.head
+        remaining = start + 1
+        for level in reversed(range(self.max_level)):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+
+        keys = []
+        while node is not self.tail and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+class Leaderboard:
+    def __init__(self) -> None:
+        self.scores: dict[str, int] = {}
+        self.ranking = SkipList()
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def set_score(self, player_name: str, score: int) -> None:
+        if player_name in self.scores:
+            self.ranking.remove((-self.scores[player_name], player_name))
+
+        self.scores[player_name] = score
+        self.ranking.insert((-score, player_name))
+
+    def add_score(self, player_name: str, score: int) -> None:
+        self.set_score(player_name, self.scores.get(player_name, 0) + score)
+
+    def get_rank(self, player_name: str) -> "int | None":
+        if player_name not in self.scores:
+            return None
+
+        return self.ranking.rank((-self.scores[player_name], player_name)) + 1
+
+    def get_top(self, count: int, start: int = 0) -> list[tuple[str, int]]:
+        return [(player_name, -score) for score, player_name in self.ranking.slice(start, count)]
+
+class WindowedLeaderboard:
+    """
+    Leaderboards of scores recorded in fixed time buckets, keeping only the newest max_buckets.
+    Windows are widened to whole buckets.
+
+    A window inside one bucket is answered from that bucket's skip list in O(log n + k).
+    A window spanning several buckets totals the players of those buckets, O(m log k) for
+    m scores in the window, so wide windows should use a larger bucket_seconds.
+    """
+
+    def __init__(self, bucket_seconds: int = 3600, max_buckets: int = 168) -> None:
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = max_buckets
+        self.buckets: dict[int, Leaderboard] = {}
+
+    def add_score(self, player_name: str, score: int, when: float) -> None:
+        bucket_index = int(when // self.bucket_seconds)
+        if bucket_index not in self.buckets:
+            if self.buckets and bucket_index <= max(self.buckets) - self.max_buckets:
+                return
+
+            self.buckets[bucket_index] = Leaderboard()
+            while len(self.buckets) > self.max_buckets:
+                del self.buckets[min(self.buckets)]
+
+        self.buckets[bucket_index].add_score(player_name, score)
+
+    def get_top(self, start: float, end: float, count: int) -> list[tuple[str, int]]:
+        first = int(start // self.bucket_seconds)
+        last = int(end // self.bucket_seconds)
+        leaderboards = [leaderboard for bucket_index, leaderboard in self.buckets.items() if first <= bucket_index <= last]
+
+        if len(leaderboards) == 1:
+            return leaderboards[0].get_top(count)
+
+        totals: dict[str, int] = {}
+        for leaderboard in leaderboards:
+            for player_name, score in leaderboard.scores.items():
+                totals[player_name] = totals.get(player_name, 0) + score
+
+        return heapq.nsmallest(count, totals.items(), key=lambda item: (-item[1], item[0]))
+
+class LeaderboardService:
+    """
+    Keeps a global leaderboard and one per lobby of each player's total score over all games,
+    updated as games change scores. Final scores of finished games are also added to windowed
+    leaderboards so top players can be found for a time range.
+    """
+
+    def __init__(self, game_manager: GameManager = None) -> None:
+        self.global_leaderboard = Leaderboard()
+        self.lobby_leaderboards: dict[str, Leaderboard] = {}
+
+        #Keyed by lobby name, "" holds the global windows
+        self.window_leaderboards: dict[str, WindowedLeaderboard] = {"": WindowedLeaderboard()}
+
+        self.game_manager = game_manager
+        if game_manager:
+            game_manager.add_score_listener(self.update_score)
+            game_manager.add_game_end_listener(self.record_game)
+
+    def check_lobby(self, lobby_name: str) -> None:
+        if lobby_name in self.lobby_leaderboards or lobby_name in self.window_leaderboards:
+            return
+
+        if self.game_manager and any(lobby.name == lobby_name for lobby in self.game_manager.lobbies):
+            return
+
+        raise LeaderboardError("Lobby does not exist: %s" % lobby_name)
+
+    def get_leaderboard(self, lobby_name: str = "") -> Leaderboard:
+        if not lobby_name:
+            return self.global_leaderboard
+
+        self.check_lobby(lobby_name)
+        if lobby_name not in self.lobby_leaderboards:
+            self.lobby_leaderboards[lobby_name] = Leaderboard()
+
+        return self.lobby_leaderboards[lobby_name]
+
+    def update_score(self, game_state: GameState, player_index: int, old_score: int, new_score: int) -> None:
+        if old_score == new_score:
+            return
+
+        player_name = game_state.game.players[player_index]
+        if game_state.lobby_name not in self.lobby_leaderboards:
+            self.lobby_leaderboards[game_state.lobby_name] = Leaderboard()
+
+        self.global_leaderboard.add_score(player_name, new_score - old_score)
+        self.lobby_leaderboards[game_state.lobby_name].add_score(player_name, new_score - old_score)
+
+    def record_game(self, game_state: GameState) -> None:
+        logging.info("LEADERBOARD recording scores for game %s (%s)" % (game_state.id, game_state.name))
+        self.add_record(game_state.lobby_name, game_state.game.players, game_state.game.scores, time.time())
+
+    def add_record(self, lobby_name: str, players: list[str], scores: list[int], when: float) -> None:
+        if lobby_name not in self.window_leaderboards:
+            self.window_leaderboards[lobby_name] = WindowedLeaderboard()
+
+        for player_name, score in zip(players, scores):
+            self.window_leaderboards[""].add_score(player_name, score, when)
+            self.window_leaderboards[lobby_name].add_score(player_name, score, when)
+
+    def get_window_top(self, start: float, end: float, count: int, lobby_name: str = "") -> list[tuple[str, int]]:
+        self.check_lobby(lobby_name)
+        if lobby_name not in self.window_leaderboards:
+            return []
+
+        return self.window_leaderboards[lobby_name].get_top(start, end, count)
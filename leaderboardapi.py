@@ -0,0 +1,68 @@
+from router import Router, RouterContext
+from leaderboard import LeaderboardService, LeaderboardError
+from webserver import Request, Response
+from util import parse_url_path, build_response
+
+class LeaderboardApi:
+    def __init__(self, leaderboard_service: LeaderboardService) -> None:
+        self.leaderboard_service = leaderboard_service
+
+    def leaderboard_top(self, request: Request, router_context: RouterContext) -> Response:
+        try:
+            path = parse_url_path(router_context.additional)
+            lobby_name = path[1] if len(path) > 1 else ""
+            leaderboard = self.leaderboard_service.get_leaderboard(lobby_name)
+            top = leaderboard.get_top(int(path[0]))
+
+            return build_response(True, extra={
+                "players": [{
+                    "name": player_name,
+                    "score": score,
+                    "rank": rank + 1
+                } for rank, (player_name, score) in enumerate(top)]
+            })
+
+        except (LeaderboardError, ValueError) as ex:
+            return build_response(False, str(ex))
+
+    def leaderboard_rank(self, request: Request, router_context: RouterContext) -> Response:
+        try:
+            path = parse_url_path(router_context.additional)
+            lobby_name = path[1] if len(path) > 1 else ""
+            leaderboard = self.leaderboard_service.get_leaderboard(lobby_name)
+            rank = leaderboard.get_rank(path[0])
+            if rank is None:
+                raise LeaderboardError("Player has no score: %s" % path[0])
+
+            return build_response(True, extra={
+                "name": path[0],
+                "score": leaderboard.scores[path[0]],
+                "rank": rank,
+                "player_count": len(leaderboard)
+            })
+
+        except (LeaderboardError, ValueError) as ex:
+            return build_response(False, str(ex))
+
+    def leaderboard_window(self, request: Request, router_context: RouterContext) -> Response:
+        try:
+            path = parse_url_path(router_context.additional)
+            lobby_name = path[3] if len(path) > 3 else ""
+            top = self.leaderboard_service.get_window_top(float(path[0]), float(path[1]), int(path[2]), lobby_name)
+
+            return build_response(True, extra={
+                "players": [{
+                    "name": player_name,
+                    "score": score,
+                    "rank": rank + 1
+                } for rank, (player_name, score) in enumerate(top)]
+            })
+
+        except (LeaderboardError, ValueError, IndexError) as ex:
+            return build_response(False, str(ex))
+
+    def setup_routes(self, router: Router) -> None:
+        leaderboard_router = router.add_sub_router("leaderboard/")
+        leaderboard_router.add_prefix_route("top", self.leaderboard_top)
+        leaderboard_router.add_prefix_route("rank", self.leaderboard_rank)
+        leaderboard_router.add_prefix_route("window", self.leaderboard_window)
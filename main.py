@@ -1,20 +1,36 @@
 import asyncio
 import logging
+import os
 from datetime import datetime
 from webserver import Server
+from botserver import BotServer
+from spectator import SpectatorHub, SpectatorServer
 from router import Router, RouterContext
 from webserver import Request, Response
 from gamemanager import GameManager
+from shardedgamemanager import ShardedGameManager
 from gamemanagerapi import GameManagerApi
-from game_guess import GuessGame
-
-async def main():
+from gameregistry import GameRegistry
+from gameregistryapi import GameRegistryApi
+from tracing import Tracer
+from tracingapi import TracingApi
+from leaderboard import LeaderboardService
+from leaderboardapi import LeaderboardApi
+
+async def main(shard_count: int = 1):
     logging.info("MAIN starting")
     
-    server = Server()
-    game_manager = GameManager()
-
-    game_manager.add_lobby("NumberGuess", GuessGame, 1)
+    tracer = Tracer(sample_rate=0.1, capacity=256)
+    server = Server(tracer)
+    if shard_count > 1:
+        game_manager = ShardedGameManager(shard_count, tracer)
+    else:
+        game_manager = GameManager(tracer)
+
+    game_registry = GameRegistry()
+    game_registry.load_config("games.json")
+    game_registry.load_entry_points()
+    game_registry.add_lobbies(game_manager)
 
     router = Router("/")
     router.add_static_route("", index)
@@ -28,15 +44,29 @@ async def main():
     game_manager_api = GameManagerApi(game_manager)
     game_manager_api.setup_routes(api_router)
 
+    game_registry_api = GameRegistryApi(game_registry)
+    game_registry_api.setup_routes(api_router)
+
+    tracing_api = TracingApi(tracer)
+    tracing_api.setup_routes(api_router)
+
+    leaderboard_api = LeaderboardApi(LeaderboardService(game_manager))
+    leaderboard_api.setup_routes(api_router)
+
     server.connection_handler = router.handle_request
+
+    bot_server = BotServer(game_manager)
+    spectator_server = SpectatorServer(SpectatorHub(game_manager))
     
     logging.info("MAIN creating tasks")
     server_task = asyncio.create_task(server.start_server())
+    bot_server_task = asyncio.create_task(bot_server.start_server())
+    spectator_server_task = asyncio.create_task(spectator_server.start_server())
     game_task = asyncio.create_task(game_manager.start_game_loop())
 
     logging.info("MAIN starting tasks")
     done, pending = await asyncio.wait(
-        [server_task, game_task], 
+        [server_task, bot_server_task, spectator_server_task, game_task], 
         return_when=asyncio.FIRST_COMPLETED
     )
 
@@ -77,6 +107,6 @@ if __name__ == "__main__":
     # logging.basicConfig(level=logging.DEBUG)
 
     try:
-        asyncio.run(main())
+        asyncio.run(main(int(os.environ.get("WEBGAME_SHARDS", "1"))))
     except Exception as ex:
         logging.critical("MAIN ERROR fatal error", exc_info=ex)
\ No newline at end of file
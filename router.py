@@ -2,6 +2,7 @@ import logging
 from dataclasses import dataclass
 from typing import Callable
 from webserver import Request, Response
+from tracing import span
 
 @dataclass
 class RouterContext:
@@ -51,18 +52,28 @@ class Router:
         return self.handle_request(request)
 
     def handle_request(self, request: Request) -> Response:
+        with span(request.trace, "router.dispatch", router=self.base_route):
+            handler, context = self.find_route(request)
+
+        if handler:
+            with span(request.trace, "router.handler", type=context.type, route=context.route):
+                return handler(request, context)
+
+        logging.warning("ROUTER '%s' could not route request %s" % (self.base_route, request))
+
+    def find_route(self, request: Request) -> "tuple[RouteHandler | None, RouterContext | None]":
         if request.path in self.static_routes:
             context = RouterContext("static", request.path, "")
-            return self.static_routes[request.path](request, context)
+            return self.static_routes[request.path], context
 
         for prefix, handler in self.prefix_routes:
             if request.path.startswith(prefix):
                 additional = request.path[len(prefix):]
                 context = RouterContext("prefix", prefix, additional)
-                return handler(request, context)
+                return handler, context
 
         if self.default_route:
             context = RouterContext("default", "", request.path)
-            return self.default_route(request, context)
-        
-        logging.warning("ROUTER '%s' could not route request %s" % (self.base_route, request))
\ No newline at end of file
+            return self.default_route, context
+
+        return None, None
\ No newline at end of file
@@ -0,0 +1,186 @@
+from bisect import bisect
+from game import Game
+from gamemanager import GameManager, GameManagerError, Player, Lobby, GameState, RoundListener, GameScoreListener, GameEndListener
+from tracing import Tracer, Trace
+import asyncio
+from typing import Callable
+import hashlib
+import logging
+
+class HashRing:
+    def __init__(self, shard_count: int, replicas: int = 64) -> None:
+        self.ring: list[tuple[int, int]] = sorted(
+            (self.hash("%d:%d" % (shard_index, replica)), shard_index)
+            for shard_index in range(shard_count)
+            for replica in range(replicas)
+        )
+        self.keys: list[int] = [key for key, _ in self.ring]
+
+    def hash(self, value: str) -> int:
+        return int(hashlib.md5(value.encode()).hexdigest()[:16], 16)
+
+    def get_shard_index(self, value: str) -> int:
+        index = bisect(self.keys, self.hash(value)) % len(self.keys)
+        return self.ring[index][1]
+
+class ShardedGameManager:
+    """
+    Splits lobbies, players and games across several GameManager shards.
+
+    Lobbies and new players are placed on a shard by consistent hashing of their name.
+    Games live on the shard of the lobby that started them, and their id is prefixed
+    with the shard index. A player joining a lobby on another shard is handed off to
+    that shard first, so each shard only ever updates its own games.
+    """
+
+    def __init__(self, shard_count: int, tracer: Tracer = None) -> None:
+        if shard_count < 1:
+            raise ValueError("Shard count must be at least 1: %d" % shard_count)
+
+        self.shards: list[GameManager] = [GameManager(tracer, "%d-" % shard_index) for shard_index in range(shard_count)]
+        self.ring = HashRing(shard_count)
+        self.player_shard_map: dict[str, GameManager] = {}
+
+    @property
+    def lobbies(self) -> list[Lobby]:
+        return [lobby for shard in self.shards for lobby in shard.lobbies]
+
+    @property
+    def players(self) -> list[Player]:
+        return [player for shard in self.shards for player in shard.players]
+
+    @property
+    def games(self) -> list[GameState]:
+        return [game_state for shard in self.shards for game_state in shard.games]
+
+    def get_shard(self, name: str) -> GameManager:
+        return self.shards[self.ring.get_shard_index(name)]
+
+    def get_lobby_shard(self, lobby_name: str) -> GameManager:
+        shard = self.get_shard(lobby_name)
+        if lobby_name not in shard.lobby_name_map:
+            raise GameManagerError("Lobby does not exist: %s" % lobby_name)
+
+        return shard
+
+    def get_player_shard(self, player_name: str) -> GameManager:
+        if player_name not in self.player_shard_map:
+            raise GameManagerError("Player does not exist: %s" % player_name)
+
+        return self.player_shard_map[player_name]
+
+    def get_game_shard(self, game_id: str) -> GameManager:
+        shard_index, _, _ = game_id.partition("-")
+        if not shard_index.isdigit() or int(shard_index) >= len(self.shards):
+            raise GameManagerError("Game does not exist: %s" % game_id)
+
+        return self.shards[int(shard_index)]
+
+    def handoff_player(self, player_name: str, target_shard: GameManager) -> None:
+        source_shard = self.get_player_shard(player_name)
+        if source_shard is target_shard:
+            return
+
+        logging.info("SHARDEDGAMEMANAGER handing off player %s from shard %d to shard %d" % (player_name, self.shards.index(source_shard), self.shards.index(target_shard)))
+        player = source_shard.detach_player(player_name)
+        target_shard.attach_player(player)
+        self.player_shard_map[player_name] = target_shard
+
+    def add_round_listener(self, listener: RoundListener) -> None:
+        for shard in self.shards:
+            shard.add_round_listener(listener)
+
+    def add_score_listener(self, listener: GameScoreListener) -> None:
+        for shard in self.shards:
+            shard.add_score_listener(listener)
+
+    def add_game_end_listener(self, listener: GameEndListener) -> None:
+        for shard in self.shards:
+            shard.add_game_end_listener(listener)
+
+    def add_lobby(self, name: str, game_factory: Callable[[list[str]], Game], min_players: int, max_players: int = 0) -> None:
+        self.get_shard(name).add_lobby(name, game_factory, min_players, max_players)
+
+    def player_join(self, name: str) -> None:
+        if name in self.player_shard_map:
+            raise GameManagerError("Player already exists: %s" % name)
+
+        shard = self.get_shard(name)
+        shard.player_join(name)
+        self.player_shard_map[name] = shard
+
+    def player_disconnect(self, name: str) -> None:
+        self.get_player_shard(name).player_disconnect(name)
+        del self.player_shard_map[name]
+
+    def get_player(self, player_name: str) -> Player:
+        return self.get_player_shard(player_name).player_name_map[player_name]
+
+    def lobby_join(self, lobby_name: str, player_name: str) -> None:
+        lobby_shard = self.get_lobby_shard(lobby_name)
+        player_shard = self.get_player_shard(player_name)
+
+        #Only free players are handed off, so report the same errors GameManager would
+        if player_shard is not lobby_shard:
+            player = self.get_player(player_name)
+            if player.game_id is not None:
+                raise GameManagerError("Player %s is already in another game: %s" % (player_name, player.game_id))
+            if player.lobby_name is not None:
+                raise GameManagerError("Player %s is already in another lobby: %s" % (player_name, player.lobby_name))
+
+            self.handoff_player(player_name, lobby_shard)
+
+        lobby_shard.lobby_join(lobby_name, player_name)
+
+    def lobby_leave(self, lobby_name: str, player_name: str) -> None:
+        lobby_shard = self.get_lobby_shard(lobby_name)
+        player_shard = self.get_player_shard(player_name)
+
+        #Players always live on the shard of the lobby they are in
+        if player_shard is not lobby_shard:
+            player_lobby_name = self.get_player(player_name).lobby_name
+            if player_lobby_name is None:
+                raise GameManagerError("Player %s cannot leave lobby, they are not in one" % player_name)
+            raise GameManagerError("Player %s cannot leave lobby, they are in another lobby: %s" % (player_name, player_lobby_name))
+
+        lobby_shard.lobby_leave(lobby_name, player_name)
+
+    def game_start(self, lobby_name: str) -> str:
+        return self.get_lobby_shard(lobby_name).game_start(lobby_name)
+
+    def game_leave(self, game_id: str, player_name: str) -> None:
+        game_shard = self.get_game_shard(game_id)
+        game_shard.get_game_state(game_id)
+        player_shard = self.get_player_shard(player_name)
+
+        #Players stay on the shard of their game until they leave it
+        if player_shard is not game_shard:
+            player_game_id = self.get_player(player_name).game_id
+            if player_game_id is None:
+                raise GameManagerError("Player %s cannot leave game, they are not in one" % player_name)
+            raise GameManagerError("Player %s cannot leave game, they are in another game: %s" % (player_name, player_game_id))
+
+        game_shard.game_leave(game_id, player_name)
+
+    def is_game_active(self, game_id: str) -> bool:
+        return self.get_game_shard(game_id).is_game_active(game_id)
+
+    def get_game_state(self, game_id: str) -> GameState:
+        return self.get_game_shard(game_id).get_game_state(game_id)
+
+    def set_player_output(self, player_name: str, player_output: str, trace: "Trace | None" = None) -> None:
+        self.get_player_shard(player_name).set_player_output(player_name, player_output, trace)
+
+    async def start_game_loop(self) -> None:
+        tasks = [asyncio.create_task(shard.start_game_loop()) for shard in self.shards]
+
+        try:
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError as ex:
+            logging.warning("SHARDEDGAMEMANAGER ERROR game loop cancelled", exc_info=ex)
+            for task in tasks:
+                task.cancel()
+
+    def update_games(self) -> None:
+        for shard in self.shards:
+            shard.update_games()
@@ -0,0 +1,211 @@
+import asyncio
+from dataclasses import dataclass, field
+import json
+import logging
+from gamemanager import GameManager, GameManagerError, GameState
+
+# Spectators connect and send one line:
+#   SPECTATE <game id>
+#
+# They receive a keyframe line with the full game state, then one delta line per round
+# containing only the fields that changed:
+#   {"type": "key", "game": ..., "round": ..., "players": [...], "scores": [...], "expected": [...], "data": [...]}
+#   {"type": "delta", "game": ..., "round": ..., "scores": [...]}
+# When the game ends they get a last delta with type "end" and the connection is closed.
+# A bad request gets a single ERROR <message> line instead.
+
+@dataclass(frozen=True)
+class Frame:
+    game_id: str
+    round: int
+    data: bytes
+
+@dataclass(eq=False)
+class Spectator:
+    name: str
+    writer: asyncio.StreamWriter
+    queue: asyncio.Queue
+
+@dataclass
+class SpectatedGame:
+    state: dict
+    keyframe: "Frame | None" = None
+    spectators: set[Spectator] = field(default_factory=set)
+
+class SpectatorHub:
+    """
+    Serializes each round of a spectated game once and hands the same Frame to every spectator.
+    Only games with spectators are tracked, and each spectator buffers at most queue_size frames
+    before it is dropped.
+    """
+
+    def __init__(self, game_manager: GameManager, queue_size: int = 16) -> None:
+        self.game_manager = game_manager
+        self.queue_size = queue_size
+        self.games: dict[str, SpectatedGame] = {}
+
+        self.game_manager.add_round_listener(self.push_round)
+        self.game_manager.add_game_end_listener(self.end_game)
+
+    def build_state(self, game_state: GameState) -> dict:
+        return {
+            "round": game_state.round,
+            "players": game_state.game.players[:],
+            "scores": game_state.game.scores[:],
+            "expected": game_state.player_expected_output[:],
+            "data": game_state.game_data[:]
+        }
+
+    def build_frame(self, game_id: str, round: int, frame_type: str, state: dict) -> Frame:
+        message = {"type": frame_type, "game": game_id, "round": round}
+        message.update(state)
+        return Frame(game_id, round, (json.dumps(message, separators=(",", ":")) + "\n").encode())
+
+    def subscribe(self, game_id: str, spectator: Spectator) -> None:
+        game_state = self.game_manager.get_game_state(game_id)
+
+        #A finished game will not change again, so send it whole and close without tracking it
+        if not self.game_manager.is_game_active(game_id):
+            logging.info("SPECTATOR %s watching finished game %s" % (spectator.name, game_id))
+            state = self.build_state(game_state)
+            for frame in (self.build_frame(game_id, state["round"], "key", state), self.build_frame(game_id, state["round"], "end", {})):
+                if not spectator.queue.full():
+                    spectator.queue.put_nowait(frame)
+            self.stop(spectator)
+            return
+
+        spectated_game = self.games.get(game_id)
+        if spectated_game is None:
+            spectated_game = SpectatedGame(self.build_state(game_state))
+            self.games[game_id] = spectated_game
+
+        if spectated_game.keyframe is None:
+            state = spectated_game.state
+            spectated_game.keyframe = self.build_frame(game_id, state["round"], "key", state)
+
+        logging.info("SPECTATOR %s watching game %s" % (spectator.name, game_id))
+        spectated_game.spectators.add(spectator)
+        self.send(spectated_game, spectator, spectated_game.keyframe)
+
+    def unsubscribe(self, game_id: str, spectator: Spectator) -> None:
+        spectated_game = self.games.get(game_id)
+        if spectated_game is None or spectator not in spectated_game.spectators:
+            return
+
+        logging.info("SPECTATOR %s stopped watching game %s" % (spectator.name, game_id))
+        spectated_game.spectators.remove(spectator)
+        if not spectated_game.spectators:
+            del self.games[game_id]
+
+    def send(self, spectated_game: SpectatedGame, spectator: Spectator, frame: "Frame | None") -> None:
+        try:
+            spectator.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            logging.warning("SPECTATOR dropping slow spectator %s" % spectator.name)
+            spectated_game.spectators.discard(spectator)
+            spectator.writer.close()
+
+    def stop(self, spectator: Spectator) -> None:
+        #Frames still waiting are not worth keeping the spectator around for
+        while spectator.queue.full():
+            spectator.queue.get_nowait()
+        spectator.queue.put_nowait(None)
+
+    def push_changes(self, spectated_game: SpectatedGame, game_state: GameState, frame_type: str) -> None:
+        state = self.build_state(game_state)
+        changes = {key: value for key, value in state.items() if spectated_game.state[key] != value}
+        spectated_game.state = state
+        spectated_game.keyframe = None
+
+        if not changes and frame_type == "delta":
+            return
+
+        frame = self.build_frame(game_state.id, game_state.round, frame_type, changes)
+        for spectator in list(spectated_game.spectators):
+            self.send(spectated_game, spectator, frame)
+
+    def push_round(self, game_state: GameState) -> None:
+        spectated_game = self.games.get(game_state.id)
+        if spectated_game is None:
+            return
+
+        self.push_changes(spectated_game, game_state, "delta")
+
+        if not spectated_game.spectators:
+            del self.games[game_state.id]
+
+    def end_game(self, game_state: GameState) -> None:
+        spectated_game = self.games.pop(game_state.id, None)
+        if spectated_game is None:
+            return
+
+        logging.info("SPECTATOR game %s ended, closing %d spectators" % (game_state.id, len(spectated_game.spectators)))
+        self.push_changes(spectated_game, game_state, "end")
+        for spectator in spectated_game.spectators:
+            self.stop(spectator)
+        spectated_game.spectators.clear()
+
+class SpectatorServer:
+    def __init__(self, hub: SpectatorHub, host: str = "192.168.99.108", port: int = 12347) -> None:
+        self.server: asyncio.base_events.Server = None
+        self.hub = hub
+        self.host = host
+        self.port = port
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        addr = writer.get_extra_info("peername")
+        spectator = Spectator("%s:%d" % (addr[0], addr[1]), writer, asyncio.Queue(self.hub.queue_size))
+        game_id = None
+        read_task = None
+
+        try:
+            command, _, argument = (await reader.readline()).decode().strip().partition(" ")
+            if command != "SPECTATE":
+                raise GameManagerError("Unknown command: %s" % command)
+
+            self.hub.subscribe(argument, spectator)
+            game_id = argument
+
+            #Spectators send nothing else, reading only notices them going away
+            read_task = asyncio.create_task(reader.read())
+            read_task.add_done_callback(lambda task: self.hub.stop(spectator))
+
+            while not writer.is_closing():
+                frame = await spectator.queue.get()
+                if frame is None:
+                    break
+
+                writer.write(frame.data)
+                await writer.drain()
+
+        except GameManagerError as ex:
+            writer.write(("ERROR %s\n" % ex).encode())
+        except ConnectionResetError as ex:
+            logging.error("SPECTATOR ERROR writing to %s - connection reset error" % spectator.name, exc_info=ex)
+        except Exception as ex:
+            logging.error("SPECTATOR ERROR while handling connection from %s" % spectator.name, exc_info=ex)
+
+        if read_task:
+            read_task.cancel()
+        if game_id is not None:
+            self.hub.unsubscribe(game_id, spectator)
+        writer.close()
+
+    async def start_server(self) -> None:
+        try:
+            self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        except asyncio.CancelledError as ex:
+            logging.warning("SPECTATOR ERROR start server cancelled", exc_info=ex)
+            return
+        except Exception as ex:
+            logging.error("SPECTATOR ERROR server could not be started", exc_info=ex)
+            return
+
+        addr = self.server.sockets[0].getsockname() if self.server.sockets else "unknown"
+        logging.info("SPECTATOR serving on %s" % (addr,))
+
+        async with self.server:
+            try:
+                await self.server.serve_forever()
+            except asyncio.CancelledError as ex:
+                logging.warning("SPECTATOR ERROR server cancelled", exc_info=ex)
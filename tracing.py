@@ -0,0 +1,101 @@
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Iterator
+import logging
+import random
+import time
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    end: float = 0.0
+    attributes: dict[str, str] = field(default_factory=dict)
+
+    def duration_ms(self) -> float:
+        return (self.end - self.start) * 1000
+
+@dataclass
+class Trace:
+    id: str
+    name: str
+    started_at: float
+    start: float
+    end: float = 0.0
+    spans: list[Span] = field(default_factory=list)
+    links: list[str] = field(default_factory=list)
+    attributes: dict[str, str] = field(default_factory=dict)
+
+    @contextmanager
+    def span(self, name: str, **attributes: str) -> Iterator[Span]:
+        span = Span(name, time.perf_counter(), attributes=attributes)
+        self.spans.append(span)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+
+    def duration_ms(self) -> float:
+        return (self.end - self.start) * 1000
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms(),
+            "links": self.links[:],
+            "attributes": dict(self.attributes),
+            "spans": [{
+                "name": span.name,
+                "offset_ms": (span.start - self.start) * 1000,
+                "duration_ms": span.duration_ms(),
+                "attributes": dict(span.attributes)
+            } for span in self.spans]
+        }
+
+def span(trace: "Trace | None", name: str, **attributes: str):
+    """Open a span on the trace, or do nothing if the request is not being traced."""
+    if trace is None:
+        return nullcontext()
+
+    return trace.span(name, **attributes)
+
+class Tracer:
+    """
+    Samples traces and keeps finished ones in a fixed size ring buffer in memory.
+    Nothing is written out on the request path, traces are only read back through the API.
+    """
+
+    def __init__(self, sample_rate: float = 0.1, capacity: int = 256) -> None:
+        self.sample_rate = sample_rate
+        self.traces: deque[Trace] = deque(maxlen=capacity)
+
+    def start_trace(self, name: str, force: bool = False) -> "Trace | None":
+        if not force and random.random() >= self.sample_rate:
+            return None
+
+        trace_id = "%016x" % random.getrandbits(64)
+        return Trace(trace_id, name, time.time(), time.perf_counter())
+
+    def finish_trace(self, trace: "Trace | None") -> None:
+        if trace is None:
+            return
+
+        trace.end = time.perf_counter()
+        logging.debug("TRACING finished trace %s (%s) in %.3fms" % (trace.id, trace.name, trace.duration_ms()))
+        self.traces.append(trace)
+
+    def get_trace(self, trace_id: str) -> "Trace | None":
+        for trace in self.traces:
+            if trace.id == trace_id:
+                return trace
+
+        return None
+
+    def get_linked_traces(self, trace_id: str) -> list[Trace]:
+        return [trace for trace in self.traces if trace_id in trace.links]
+
+    def list_traces(self, name: str = "") -> list[Trace]:
+        return [trace for trace in self.traces if not name or trace.name == name]
@@ -0,0 +1,40 @@
+from router import Router, RouterContext
+from tracing import Tracer
+from webserver import Request, Response
+from util import parse_url_path, build_response
+
+class TracingApi:
+    def __init__(self, tracer: Tracer) -> None:
+        self.tracer = tracer
+
+    def trace_list(self, request: Request, router_context: RouterContext) -> Response:
+        path = parse_url_path(router_context.additional)
+        traces = [{
+            "id": trace.id,
+            "name": trace.name,
+            "started_at": trace.started_at,
+            "duration_ms": trace.duration_ms(),
+            "attributes": dict(trace.attributes)
+        } for trace in self.tracer.list_traces(path[0])]
+
+        return build_response(True, extra={
+            "traces": traces
+        })
+
+    def trace_get(self, request: Request, router_context: RouterContext) -> Response:
+        path = parse_url_path(router_context.additional)
+        trace = self.tracer.get_trace(path[0])
+        if trace is None:
+            return build_response(False, "Trace does not exist: %s" % path[0])
+
+        linked = [linked_trace.to_dict() for linked_trace in self.tracer.get_linked_traces(trace.id)]
+
+        return build_response(True, extra={
+            "trace": trace.to_dict(),
+            "linked_traces": linked
+        })
+
+    def setup_routes(self, router: Router) -> None:
+        trace_router = router.add_sub_router("trace/")
+        trace_router.add_prefix_route("list", self.trace_list)
+        trace_router.add_prefix_route("get", self.trace_get)
@@ -1,6 +1,27 @@
+from webserver import Response
+
 
 def parse_url_path(path: str) -> list[str]:
     if path.startswith("/"):
         path = path[1:]
     
-    return path.split("/")
\ No newline at end of file
+    return path.split("/")
+
+def build_response(success: bool, message: str = "", extra: "dict | None" = None) -> Response:
+    response = {}
+    status = ""
+
+    if success:
+        response["status"] = "success"
+        status = "200"
+    else:
+        response["status"] = "error"
+        status = "400"
+
+    if message:
+        response["message"] = message
+
+    if extra:
+        response.update(extra)
+
+    return Response(response, status)
\ No newline at end of file
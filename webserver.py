@@ -3,6 +3,7 @@ from dataclasses import dataclass
 import logging
 from typing import AsyncGenerator
 import json
+from tracing import Tracer, Trace, span
 
 @dataclass
 class Request:
@@ -11,6 +12,7 @@ class Request:
     version: str
     headers: dict[str, str]
     body: "str | None"
+    trace: "Trace | None" = None
 
 @dataclass
 class Response:
@@ -25,9 +27,10 @@ class Response:
         return json.dumps(self.body)
 
 class Server:
-    def __init__(self) -> None:
+    def __init__(self, tracer: Tracer = None) -> None:
         self.server: asyncio.base_events.Server = None
         self.chunk_size: int = 100
+        self.tracer: Tracer = tracer if tracer else Tracer(0)
 
         self.status_codes = {
             "200": "OK",
@@ -37,6 +40,7 @@ class Server:
         }
 
     async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        trace = self.tracer.start_trace("http")
         try:
             addr = writer.get_extra_info("peername")
             name = "%s:%d" % (addr[0], addr[1])
@@ -55,23 +59,27 @@ class Server:
             path = ""
             version = ""
             headers = {}
+            body = None
 
-            async for line in self.read_http(reader, name, self.chunk_size):
-                if not line:
-                    continue
+            with span(trace, "http.read"):
+                async for line in self.read_http(reader, name, self.chunk_size):
+                    if not line:
+                        continue
 
-                if not method:
-                    method, path, version = line.split()
-                elif ":" in line:
-                    header_name, data = line.split(":", 1)
-                    headers[header_name] = data
-                else:
-                    logging.warning("WEBSERVER unhandled HTTP line %s" % line)
+                    if not method:
+                        method, path, version = line.split()
+                    elif ":" in line:
+                        header_name, data = line.split(":", 1)
+                        headers[header_name] = data
+                    else:
+                        logging.warning("WEBSERVER unhandled HTTP line %s" % line)
 
-            
+            if trace:
+                trace.attributes["method"] = method
+                trace.attributes["path"] = path
 
             logging.info("WEBSERVER handling request from %s: %s %s" % (name, method, path))
-            request = Request(method, path, version, headers, body)
+            request = Request(method, path, version, headers, body, trace)
             response = self.connection_handler(request)
             if not response:
                 logging.warning("WEBSERVER unhandled request from %s" % name)
@@ -81,9 +89,17 @@ class Server:
             logging.error("WEBSERVER ERROR while handling connection from %s" % name, exc_info=ex)
             response = Response("Unexpected Server Error", "500")
 
-        await self.write(writer, "%s %s %s\r\n\r\n%s" % (response.version, response.status, self.status_codes[response.status], response.body_as_string()), name)
+        with span(trace, "http.serialize"):
+            body_string = response.body_as_string()
+
+        with span(trace, "http.write"):
+            await self.write(writer, "%s %s %s\r\n\r\n%s" % (response.version, response.status, self.status_codes[response.status], body_string), name)
         writer.close()
 
+        if trace:
+            trace.attributes["status"] = response.status
+        self.tracer.finish_trace(trace)
+
     def connection_handler(self, request: Request) -> Response:
         logging.warning("WEBSERVER default connection handler was used. Request: %s %s" % (request.method, request.path))
 